@@ -1,18 +1,32 @@
 """
 Script to run the FastAPI application
 """
+import os
+
+# Must be set before torch is imported by the workers. Expandable segments and
+# power-of-two rounding keep the varying padded input shapes from fragmenting the
+# CUDA caching allocator; deployments can override it through the environment.
+os.environ.setdefault(
+    "PYTORCH_CUDA_ALLOC_CONF",
+    "expandable_segments:True,max_split_size_mb:256,roundup_power2_divisions:16"
+)
+
 import uvicorn
-from src.api import app
 
 if __name__ == "__main__":
     print("Starting Car Detection API...")
     print("API will be available at: http://localhost:8000")
     print("API documentation at: http://localhost:8000/docs")
     
+    # Each worker loads its own model in the app lifespan; use WORKERS=1 to keep
+    # a single model per GPU and rely on request batching for concurrency.
     uvicorn.run(
-        app, 
+        "src.api:app", 
         host="0.0.0.0", 
         port=8000,
-        reload=True,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", "2")),
+        reload=os.getenv("RELOAD", "0") == "1",
         log_level="info"
-    )
\ No newline at end of file
+    )
@@ -1,10 +1,15 @@
 """
 FastAPI application for car detection
 """
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import List, Literal
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-import tempfile
+from fastapi.responses import ORJSONResponse
+import asyncio
 import os
+from .batching import BatchScheduler
 from .car_detector import CarDetector
 import logging
 
@@ -12,24 +17,120 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Car detector, initialized per worker process by the app lifespan
+detector = None
+
+# Largest micro-batch, also the number of images of one request preprocessed at a time
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+
+# Keep blocking work off the event loop. Inference gets a single worker because the
+# GPU serializes forwards anyway; decoding and resizing can run in parallel.
+inference_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detr")
+preprocess_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREPROCESS_WORKERS", "4")),
+    thread_name_prefix="preprocess"
+)
+
+# Coalesces concurrent requests into micro-batches, started with the app
+scheduler = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the car detector and start the batch scheduler for the lifetime of the app"""
+    global detector, scheduler
+    try:
+        # Loads and warms up the model; the server accepts requests only once this returns.
+        # Built on the inference thread because CUDA graphs recorded by torch.compile
+        # are only replayed on the thread that recorded them.
+        detector = await asyncio.get_running_loop().run_in_executor(inference_pool, partial(
+            CarDetector,
+            model_backend=os.getenv("MODEL_BACKEND", "detr-r50"),
+            cache_size=int(os.getenv("CACHE_SIZE", "1024")),
+            max_batch_size=BATCH_MAX_SIZE,
+            use_tensorrt=os.getenv("USE_TENSORRT", "0") == "1",
+            compile_model=os.getenv("COMPILE_MODEL", "0") == "1",
+            quantize=os.getenv("QUANTIZE_INT8", "0") == "1",
+            calibration_dir=os.getenv("CALIBRATION_DIR")
+        ))
+        logger.info("Car detector initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize car detector: {e}")
+        detector = None
+    
+    if detector:
+        scheduler = BatchScheduler(
+            detector,
+            # May be lower than BATCH_MAX_SIZE when the TensorRT engine caps it
+            max_batch=detector.max_batch_size,
+            max_delay_ms=float(os.getenv("BATCH_MAX_DELAY_MS", "10")),
+            executor=inference_pool
+        )
+        scheduler.start()
+    yield
+    if scheduler:
+        await scheduler.stop()
+        scheduler = None
+    if detector:
+        detector.save_compile_cache()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Car Detection API",
     description="API to detect cars in images using DETR model",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Initialize car detector
-try:
-    detector = CarDetector()
-    logger.info("Car detector initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize car detector: {e}")
-    detector = None
+def prepare_image(data: bytes):
+    """Decode and preprocess one uploaded image, runs in the preprocess pool"""
+    return detector.preprocess(detector.decode_image(data))
+
+async def run_detection(contents: List[bytes]) -> list:
+    """
+    Detect cars in a list of encoded images, batching through the scheduler when it is running
+    
+    Args:
+        contents: Encoded image bytes as uploaded
+        
+    Returns:
+        List of (has_cars, detections) tuples, one per image, with columnar detections
+    """
+    # Repeated uploads are answered from the detector's cache without touching the GPU
+    keys = [detector.cache_key(data) for data in contents]
+    results = [detector.cache_get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    if not misses:
+        return results
+    
+    # Preprocess one batch worth of images at a time, so a large upload never holds
+    # more than BATCH_MAX_SIZE preprocessed tensors on the device
+    loop = asyncio.get_running_loop()
+    for start in range(0, len(misses), BATCH_MAX_SIZE):
+        chunk = misses[start:start + BATCH_MAX_SIZE]
+        inputs = await asyncio.gather(
+            *(loop.run_in_executor(preprocess_pool, prepare_image, contents[i]) for i in chunk)
+        )
+        if scheduler:
+            computed = await asyncio.gather(
+                *(scheduler.submit(pixel_values, target_size) for pixel_values, target_size in inputs)
+            )
+        else:
+            pixel_values, target_sizes = zip(*inputs)
+            computed = await loop.run_in_executor(
+                inference_pool, detector.detect_cars_batch, list(pixel_values), list(target_sizes)
+            )
+        
+        for i, result in zip(chunk, computed):
+            detector.cache_put(keys[i], result)
+            results[i] = result
+    return results
 
 @app.get("/")
 async def root():
-    """Health check endpoint"""
+    """Health check endpoint, not ready until the model is loaded and warmed up"""
+    if not detector:
+        raise HTTPException(status_code=503, detail="Model not loaded")
     return {"message": "Car Detection API is running", "status": "healthy"}
 
 @app.get("/model-info")
@@ -40,12 +141,13 @@ async def get_model_info():
     return detector.get_model_info()
 
 @app.post("/detect-car")
-async def detect_car(file: UploadFile = File(...)):
+async def detect_car(file: UploadFile = File(...), layout: Literal["records", "soa"] = "records"):
     """
     Detect cars in uploaded image
     
     Args:
         file: Image file to analyze
+        layout: "records" for one dict per car, "soa" for shared scores/boxes columns
         
     Returns:
         JSON response with detection results
@@ -57,21 +159,17 @@ async def detect_car(file: UploadFile = File(...)):
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-        content = await file.read()
-        tmp_file.write(content)
-        tmp_file_path = tmp_file.name
+    content = await file.read()
     
     try:
         # Detect cars
-        has_cars, detections = detector.detect_cars(tmp_file_path)
+        has_cars, detections = (await run_detection([content]))[0]
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "filename": file.filename,
             "has_cars": has_cars,
-            "car_count": len(detections),
-            "detections": detections,
+            "car_count": detections["count"],
+            "detections": detections if layout == "soa" else CarDetector.to_records(detections),
             "model_info": {
                 "model_name": detector.model_name,
                 "confidence_threshold": detector.confidence_threshold
@@ -81,11 +179,6 @@ async def detect_car(file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error processing image: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
-    
-    finally:
-        # Clean up temporary file
-        if os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path)
 
 @app.post("/detect-car-simple")
 async def detect_car_simple(file: UploadFile = File(...)):
@@ -105,17 +198,13 @@ async def detect_car_simple(file: UploadFile = File(...)):
     if not file.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-        content = await file.read()
-        tmp_file.write(content)
-        tmp_file_path = tmp_file.name
+    content = await file.read()
     
     try:
         # Detect cars
-        has_cars = detector.detect_car_simple(tmp_file_path)
+        has_cars, _ = (await run_detection([content]))[0]
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "filename": file.filename,
             "car_detected": has_cars
         })
@@ -123,11 +212,53 @@ async def detect_car_simple(file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error processing image: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+@app.post("/detect-cars-batch")
+async def detect_cars_batch(files: List[UploadFile] = File(...),
+                            layout: Literal["records", "soa"] = "records"):
+    """
+    Detect cars in several uploaded images with batched inference
+    
+    Args:
+        files: Image files to analyze
+        layout: "records" for one dict per car, "soa" for shared scores/boxes columns
+        
+    Returns:
+        JSON response with detection results per image
+    """
+    if not detector:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    
+    # Validate file types
+    for file in files:
+        if not file.content_type.startswith('image/'):
+            raise HTTPException(status_code=400, detail=f"File must be an image: {file.filename}")
+    
+    contents = [await file.read() for file in files]
     
-    finally:
-        # Clean up temporary file
-        if os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path)
+    try:
+        # Detect cars
+        results = await run_detection(contents)
+        
+        return ORJSONResponse(content={
+            "results": [
+                {
+                    "filename": file.filename,
+                    "has_cars": has_cars,
+                    "car_count": detections["count"],
+                    "detections": detections if layout == "soa" else CarDetector.to_records(detections)
+                }
+                for file, (has_cars, detections) in zip(files, results)
+            ],
+            "model_info": {
+                "model_name": detector.model_name,
+                "confidence_threshold": detector.confidence_threshold
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Error processing images: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing images: {str(e)}")
 
 if __name__ == "__main__":
     import uvicorn
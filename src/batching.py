@@ -0,0 +1,102 @@
+"""
+Dynamic micro-batching of concurrent detection requests
+"""
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+import torch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """Coalesce concurrent single-image requests into one batched forward pass"""
+
+    def __init__(self, detector, max_batch: int = 8, max_delay_ms: float = 10,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            detector: CarDetector used to run the batched inference
+            max_batch: Maximum number of images per forward pass
+            max_delay_ms: Maximum time to wait for a batch to fill up
+            executor: Executor running the blocking forward pass, the loop's default if None
+        """
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.executor = executor
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background batching task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the background batching task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, pixel_values: torch.Tensor,
+                     target_size: Tuple[int, int]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Queue a preprocessed image and wait for its detections
+
+        Args:
+            pixel_values: Preprocessed image as returned by CarDetector.preprocess
+            target_size: Original (height, width) of the image
+
+        Returns:
+            Tuple of (has_cars: bool, detections: Dict) with columnar detections
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((pixel_values, target_size, future))
+        return await future
+
+    async def run(self):
+        """Collect queued requests and flush them every max_delay or when max_batch is reached"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._process(batch)
+
+    async def _process(self, batch: List[Tuple[torch.Tensor, Tuple[int, int], asyncio.Future]]):
+        """Run one batched forward pass and resolve the waiting futures"""
+        pixel_values, target_sizes, futures = zip(*batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.detector.detect_cars_batch, list(pixel_values), list(target_sizes)
+            )
+        except Exception as e:
+            logger.error(f"Batched detection failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
@@ -1,45 +1,642 @@
 """
 Car Detection Module using DETR (Detection Transformer)
 """
-from transformers import DetrImageProcessor, DetrForObjectDetection
+from transformers import (
+    DetrImageProcessor, DetrForObjectDetection, RTDetrImageProcessor, RTDetrForObjectDetection
+)
+from transformers.models.detr.image_processing_detr import get_size_with_aspect_ratio
+from transformers.utils import is_accelerate_available
 from PIL import Image
+import numpy as np
 import torch
 import logging
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Iterable, Optional, Union
+import io
 import os
+import re
+import threading
+from cachetools import LRUCache
+import xxhash
+import torch.nn.functional as F
+from torchvision.io import ImageReadMode, decode_jpeg
+from torchvision.transforms.v2 import functional as TF
+from . import trt_engine
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+except ImportError:  # PyTurboJPEG is optional, PIL decodes everything otherwise
+    TurboJPEG = TJPF_RGB = None
+
+try:
+    from ultralytics import YOLO
+except ImportError:  # ultralytics is only needed for the yolov8n backend
+    YOLO = None
+
+JPEG_MAGIC = b"\xff\xd8\xff"
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Padded shapes used when the model is compiled, one per orientation of the
+# processor's default resize (shortest edge 800, longest edge 1333), plus the
+# square bucket that batches mixing both orientations are padded into. Keeping
+# inputs static lets torch.compile replay one CUDA graph instead of recompiling.
+STATIC_SHAPES = [(800, 1333), (1333, 800), (1333, 1333)]
+
+# Files picked up from calibration_dir for INT8 calibration
+CALIBRATION_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+# Dummy input used to warm up uncompiled models, a typical 4:3 image after resizing
+WARMUP_SHAPE = trt_engine.OPT_SHAPE[2:]
+
+# Supported detector backends and their default model identifiers
+MODEL_BACKENDS = {
+    "detr-r50": "facebook/detr-resnet-50",
+    "rtdetr-r18": "PekingU/rtdetr_r18vd",
+    "yolov8n": "yolov8n.pt",
+}
+
 class CarDetector:
-    """Car detection using Facebook's DETR model"""
+    """Car detection using Facebook's DETR model, or a faster RT-DETR / YOLOv8 backend"""
     
-    def __init__(self, model_name: str = "facebook/detr-resnet-50", confidence_threshold: float = 0.9):
+    def __init__(self, model_name: Optional[str] = None, confidence_threshold: float = 0.9,
+                 model_backend: str = "detr-r50", use_tensorrt: bool = False, compile_model: bool = False,
+                 quantize: bool = False, calibration_dir: Optional[str] = None, cache_dir: Optional[str] = None,
+                 cache_size: int = 1024, max_batch_size: int = 8):
         """
         Initialize the car detector
         
         Args:
-            model_name: HuggingFace model identifier
+            model_name: HuggingFace model identifier (or YOLO weights), defaults to the backend's model
             confidence_threshold: Minimum confidence score for detections
+            model_backend: One of MODEL_BACKENDS; "yolov8n" and "rtdetr-r18" trade some accuracy for latency
+            use_tensorrt: Run inference through a TensorRT engine when available
+            compile_model: Compile the model with torch.compile and CUDA graphs
+            quantize: Run INT8 kernels, through TensorRT on GPU or dynamic quantization on CPU
+            calibration_dir: Directory of representative images for TensorRT INT8 calibration
+            cache_dir: Directory for compiled artifacts such as TensorRT engines
+            cache_size: Number of detection results cached by image content, 0 disables the cache
+            max_batch_size: Largest batch per forward pass, bigger batches are split.
+                Lowered to the engine's limit when TensorRT is used.
         """
-        self.model_name = model_name
+        if model_backend not in MODEL_BACKENDS:
+            raise ValueError(f"Unknown model backend: {model_backend}, expected one of {list(MODEL_BACKENDS)}")
+        self.model_backend = model_backend
+        self.model_name = model_name or MODEL_BACKENDS[model_backend]
         self.confidence_threshold = confidence_threshold
+        self.use_tensorrt = use_tensorrt
+        self.compile_model = compile_model
+        self.quantize = quantize
+        self.calibration_dir = calibration_dir
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "car_detection_api")
+        self.max_batch_size = max_batch_size
         self.processor = None
         self.model = None
+        self.id2label = None
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.dtype = torch.float16 if self.device.type == "cuda" else torch.float32
+        # Per-thread side streams for decoding, host-to-device copies and preprocessing,
+        # so each preprocess worker overlaps inference and never waits on the others
+        self._streams = threading.local() if self.device.type == "cuda" else None
+        self._trt_runner = None
+        self._car_label_id = None
+        self._tj = None
+        self._mean = None
+        self._std = None
+        self._normalize = None
+        self._compiled = False
+        # Results keyed by image digest, shared by the API's worker threads
+        self._cache = LRUCache(maxsize=cache_size) if cache_size > 0 else None
+        self._cache_lock = threading.Lock()
         self._load_model()
     
     def _load_model(self):
-        """Load the DETR model and processor"""
+        """Load the model and processor"""
         try:
-            logger.info(f"Loading model: {self.model_name}")
-            self.processor = DetrImageProcessor.from_pretrained(self.model_name)
-            self.model = DetrForObjectDetection.from_pretrained(self.model_name)
-            logger.info("Model loaded successfully")
+            logger.info(f"Loading model: {self.model_name} ({self.model_backend})")
+            self._load_jpeg_decoder()
+            if self.model_backend == "yolov8n":
+                self._load_yolo_model()
+            else:
+                self._load_transformers_model()
+            if not self._compiled:
+                # Compiled models were already warmed up on their static shapes
+                self._warmup([self._warmup_shape()])
+            if self.device.type == "cuda":
+                # Hand loading and warmup temporaries back so inference starts from a compact pool
+                torch.cuda.empty_cache()
+            logger.info(f"Model loaded successfully on {self.device} ({self.dtype})")
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
     
+    def _load_transformers_model(self):
+        """Load a DETR-family model and processor from HuggingFace"""
+        if self.model_backend == "rtdetr-r18":
+            processor_class, model_class = RTDetrImageProcessor, RTDetrForObjectDetection
+        else:
+            processor_class, model_class = DetrImageProcessor, DetrForObjectDetection
+        
+        self.processor = processor_class.from_pretrained(self.model_name)
+        self._load_normalization()
+        self.model = model_class.from_pretrained(self.model_name, **self._pretrained_kwargs())
+        self.model.eval()
+        self.id2label = self.model.config.id2label
+        self._car_label_id = next(label_id for label_id, label in self.id2label.items() if label == "car")
+        if self.use_tensorrt:
+            # Export from the FP32 weights, TensorRT picks its own FP16/INT8 kernels
+            self._load_trt_engine()
+        if self._trt_runner is not None:
+            # The engine holds its own copy of the weights, keeping the PyTorch model would duplicate them
+            self.model = None
+            return
+        self.model = self.model.to(self.device, memory_format=torch.channels_last).to(self.dtype).eval()
+        if self.quantize:
+            self._quantize_dynamic()
+        if self.compile_model:
+            self._compile()
+    
+    def _pretrained_kwargs(self) -> Dict[str, Any]:
+        """
+        Loading options that stream the checkpoint straight onto the target device
+        
+        With accelerate installed the model is created on the meta device and each weight
+        is materialized once, on self.device and in its final dtype, instead of building a
+        full FP32 copy in CPU RAM first. Without it from_pretrained's defaults are used.
+        """
+        if not is_accelerate_available():
+            return {}
+        return {
+            "low_cpu_mem_usage": True,
+            "device_map": {"": self.device},
+            # TensorRT exports from the FP32 weights
+            "torch_dtype": torch.float32 if self.use_tensorrt else self.dtype
+        }
+    
+    def _load_yolo_model(self):
+        """Load an ultralytics YOLO model"""
+        if YOLO is None:
+            raise ImportError("The yolov8n backend requires the ultralytics package")
+        if self.use_tensorrt or self.compile_model or self.quantize:
+            logger.warning("TensorRT, compile and quantize options only apply to DETR backends, ignoring")
+        
+        self.model = YOLO(self.model_name)
+        self.model.to(self.device)
+        self.id2label = dict(self.model.names)
+        self._car_label_id = next(label_id for label_id, label in self.id2label.items() if label == "car")
+    
+    def _load_jpeg_decoder(self):
+        """Load the SIMD libjpeg-turbo decoder if it is installed"""
+        if TurboJPEG is None:
+            return
+        try:
+            self._tj = TurboJPEG()
+        except Exception as e:
+            logger.warning(f"libjpeg-turbo not available, decoding JPEGs with PIL: {e}")
+    
+    def _load_normalization(self):
+        """Cache the processor's normalization constants as device tensors"""
+        if self.processor.do_normalize:
+            mean, std = self.processor.image_mean, self.processor.image_std
+        else:
+            mean, std = [0.0, 0.0, 0.0], [1.0, 1.0, 1.0]
+        self._mean = torch.tensor(mean, device=self.device, dtype=self.dtype).view(3, 1, 1)
+        self._std = torch.tensor(std, device=self.device, dtype=self.dtype).view(3, 1, 1)
+        
+        def normalize(image: torch.Tensor) -> torch.Tensor:
+            return (image.to(self.dtype) / 255 - self._mean) / self._std
+        
+        # On CUDA the scale, shift and divide fuse into a single kernel
+        self._normalize = torch.compile(normalize, dynamic=True) if self.device.type == "cuda" else normalize
+    
+    def _load_trt_engine(self):
+        """Build (or load from cache) a TensorRT engine for the loaded model"""
+        if not trt_engine.is_available():
+            logger.warning("TensorRT or CUDA not available, falling back to PyTorch inference")
+            return
+        calibrator = None
+        if self.quantize:
+            calibration_cache = trt_engine.calibration_cache_path(self.model_name, self.cache_dir)
+            if not os.path.exists(calibration_cache) and not (
+                self.calibration_dir and os.path.isdir(self.calibration_dir)
+            ):
+                raise ValueError(
+                    f"INT8 TensorRT needs a calibration image directory, got {self.calibration_dir!r}"
+                )
+            calibrator = trt_engine.make_calibrator(self._calibration_batches, calibration_cache)
+        engine_bytes = trt_engine.load_or_build_engine(
+            self.model, self.model_name, self.cache_dir, calibrator=calibrator
+        )
+        self._trt_runner = trt_engine.TrtRunner(engine_bytes)
+        if self.max_batch_size > trt_engine.MAX_BATCH_SIZE:
+            logger.warning(f"Limiting batches to the TensorRT profile maximum of {trt_engine.MAX_BATCH_SIZE}")
+            self.max_batch_size = trt_engine.MAX_BATCH_SIZE
+        logger.info("TensorRT engine ready")
+    
+    def _calibration_batches(self):
+        """
+        Yield up to 100 calibration images as (pixel_values, pixel_mask) of the engine's optimal shape
+        
+        Images are resized to fit keeping their aspect ratio and padded like a production batch.
+        """
+        _, _, height, width = trt_engine.OPT_SHAPE
+        filenames = sorted(
+            filename for filename in os.listdir(self.calibration_dir)
+            if os.path.splitext(filename)[1].lower() in CALIBRATION_EXTENSIONS
+        )[:100]
+        logger.info(f"Calibrating INT8 engine on {len(filenames)} images")
+        for filename in filenames:
+            try:
+                with open(os.path.join(self.calibration_dir, filename), "rb") as f:
+                    image = self.decode_image(f.read()).to(self.device)
+            except Exception as e:
+                logger.warning(f"Skipping calibration image {filename}: {e}")
+                continue
+            
+            scale = min(height / image.shape[-2], width / image.shape[-1])
+            size = [min(height, round(image.shape[-2] * scale)), min(width, round(image.shape[-1] * scale))]
+            pixel_values = self._normalize(TF.resize(image, size=size, antialias=True)).float()
+            
+            padding = (0, width - size[1], 0, height - size[0])
+            pixel_mask = torch.ones(size, dtype=torch.int32, device=pixel_values.device)
+            yield F.pad(pixel_values, padding).unsqueeze(0), F.pad(pixel_mask, padding).unsqueeze(0)
+    
+    def _quantize_dynamic(self):
+        """Quantize the transformer FFN linears to INT8, attention stays in floating point"""
+        if self.device.type != "cpu":
+            logger.warning("PyTorch INT8 kernels are CPU only, use TensorRT for INT8 on GPU")
+            return
+        
+        ffn_layers = {
+            name: torch.ao.quantization.per_channel_dynamic_qconfig
+            for name, module in self.model.named_modules()
+            if isinstance(module, torch.nn.Linear) and name.rsplit(".", 1)[-1] in ("fc1", "fc2")
+        }
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, ffn_layers, dtype=torch.qint8)
+        logger.info(f"Quantized {len(ffn_layers)} FFN layers to INT8")
+    
+    @property
+    def _compile_cache_path(self) -> str:
+        key = re.sub(r"[^A-Za-z0-9._-]+", "_", self.model_name)
+        return os.path.join(self.cache_dir, f"{key}_compile.bin")
+    
+    def _compile(self):
+        """Compile the model and warm it up on the static input shapes"""
+        if os.path.exists(self._compile_cache_path) and hasattr(torch.compiler, "load_cache_artifacts"):
+            logger.info(f"Loading compile cache: {self._compile_cache_path}")
+            with open(self._compile_cache_path, "rb") as f:
+                torch.compiler.load_cache_artifacts(f.read())
+        
+        # reduce-overhead records a CUDA graph per static shape and replays it as one launch
+        self.model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
+        
+        logger.info("Compiling model, this may take a while")
+        # DETR inputs are padded to STATIC_SHAPES, RT-DETR always sees its fixed resize shape.
+        # Each batch size is its own graph, record all the ones detect_cars_batch can send.
+        shapes = STATIC_SHAPES if "shortest_edge" in self.processor.size else [self._warmup_shape()]
+        self._warmup(shapes, batch_sizes=range(1, self.max_batch_size + 1))
+        self._compiled = True
+        logger.info("Model compiled")
+    
+    def _warmup_shape(self) -> Tuple[int, int]:
+        """Input shape the model sees in production, fixed for RT-DETR's resize"""
+        size = self.processor.size if self.model_backend != "yolov8n" else {}
+        if "height" in size:
+            return size["height"], size["width"]
+        return WARMUP_SHAPE
+    
+    def _warmup(self, shapes: List[Tuple[int, int]], batch_sizes: Iterable[int] = (1,), iterations: int = 3):
+        """
+        Run dummy images through decoding, preprocessing and the forward pass so the first
+        request does not pay for nvJPEG setup, compiling the normalization, cuDNN autotuning,
+        CUDA graph capture or allocator growth
+        
+        Args:
+            shapes: (height, width) of the dummy inputs
+            batch_sizes: Batch sizes to run for every shape
+            iterations: Forward passes per shape and batch size
+        """
+        if self.device.type == "cuda":
+            torch.backends.cudnn.benchmark = True
+        
+        for height, width in shapes:
+            buffer = io.BytesIO()
+            Image.new('RGB', (width, height)).save(buffer, format='JPEG')
+            pixel_values, _ = self.preprocess(self.decode_image(buffer.getvalue()))
+            if self.model_backend != "yolov8n":
+                # Shapes such as the square bucket are only reached by padding a batch, pad the same way
+                pixel_values = F.pad(
+                    pixel_values, (0, width - pixel_values.shape[-1], 0, height - pixel_values.shape[-2])
+                )
+            for batch_size in batch_sizes:
+                for _ in range(iterations):
+                    if self.model_backend == "yolov8n":
+                        self._detect_yolo_batch([pixel_values] * batch_size)
+                    else:
+                        self._forward(*self._pad_batch([pixel_values] * batch_size))
+        
+        if self.device.type == "cuda":
+            torch.cuda.synchronize()
+        logger.info("Warmup complete")
+    
+    def save_compile_cache(self):
+        """Persist torch.compile artifacts so the next process start skips compilation"""
+        if not self.compile_model or not hasattr(torch.compiler, "save_cache_artifacts"):
+            return
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._compile_cache_path, "wb") as f:
+            f.write(artifacts[0])
+        logger.info(f"Saved compile cache: {self._compile_cache_path}")
+    
+    def _pad_to_static_shape(self, pixel_values: torch.Tensor,
+                             pixel_mask: Optional[torch.Tensor]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Pad a batch to the smallest static shape that fits it, masking the padding"""
+        height, width = pixel_values.shape[-2:]
+        for static_height, static_width in STATIC_SHAPES:
+            if height <= static_height and width <= static_width:
+                break
+        else:
+            return pixel_values, pixel_mask
+        
+        if pixel_mask is None:
+            pixel_mask = torch.ones((pixel_values.shape[0], height, width), dtype=torch.long,
+                                    device=pixel_values.device)
+        padding = (0, static_width - width, 0, static_height - height)
+        return F.pad(pixel_values, padding), F.pad(pixel_mask, padding)
+    
+    def _forward(self, pixel_values: torch.Tensor, pixel_mask: Optional[torch.Tensor] = None):
+        """
+        Run the model forward pass
+        
+        Args:
+            pixel_values: Preprocessed image batch of shape [B, 3, H, W]
+            pixel_mask: Optional padding mask of shape [B, H, W]
+            
+        Returns:
+            Model outputs exposing logits and pred_boxes
+        """
+        if pixel_mask is not None:
+            pixel_mask = pixel_mask.to(self.device, non_blocking=True)
+        if self._trt_runner is not None:
+            # The engine casts to its own FP32 contiguous input, a FP16 channels_last copy would be wasted
+            return self._trt_runner(pixel_values.to(self.device, non_blocking=True), pixel_mask)
+        
+        pixel_values = pixel_values.to(
+            self.device, dtype=self.dtype, memory_format=torch.channels_last, non_blocking=True
+        )
+        if self.compile_model and "shortest_edge" in self.processor.size:
+            pixel_values, pixel_mask = self._pad_to_static_shape(pixel_values, pixel_mask)
+        with torch.inference_mode(), torch.autocast(self.device.type, dtype=self.dtype,
+                                                    enabled=self.device.type == "cuda"):
+            outputs = self.model(pixel_values=pixel_values, pixel_mask=pixel_mask)
+        # Post-process in FP32 so box coordinates keep full precision. On CUDA this
+        # also copies the outputs out of the CUDA graph's static buffers.
+        return trt_engine.DetrOutputs(outputs.logits.float(), outputs.pred_boxes.float())
+    
+    def load_image(self, image_path: str) -> Image.Image:
+        """
+        Load an image from disk as RGB
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            RGB PIL image
+        """
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Image file not found: {image_path}")
+        
+        return self._to_rgb(Image.open(image_path))
+    
+    def load_image_bytes(self, data: bytes) -> Image.Image:
+        """
+        Decode an in-memory image as RGB
+        
+        Args:
+            data: Encoded image bytes (JPEG, PNG, ...)
+            
+        Returns:
+            RGB PIL image
+        """
+        if self._tj is not None and data[:3] == JPEG_MAGIC:
+            try:
+                return Image.fromarray(self._tj.decode(data, pixel_format=TJPF_RGB))
+            except Exception as e:
+                logger.warning(f"TurboJPEG decode failed, falling back to PIL: {e}")
+        return self._to_rgb(Image.open(io.BytesIO(data)))
+    
+    @staticmethod
+    def _to_rgb(image: Image.Image) -> Image.Image:
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return image
+    
+    def decode_image(self, data: bytes) -> torch.Tensor:
+        """
+        Decode an in-memory image to a uint8 tensor
+        
+        JPEGs are decoded on the GPU with nvJPEG when running on CUDA, which
+        skips a host-to-device copy of the full-resolution image.
+        
+        Args:
+            data: Encoded image bytes (JPEG, PNG, ...)
+            
+        Returns:
+            RGB uint8 tensor of shape [3, H, W]
+        """
+        if self.device.type == "cuda" and self.model_backend != "yolov8n" and data[:3] == JPEG_MAGIC:
+            try:
+                stream = self._side_stream()
+                with torch.cuda.stream(stream):
+                    image = decode_jpeg(torch.frombuffer(bytearray(data), dtype=torch.uint8),
+                                        mode=ImageReadMode.RGB, device=self.device)
+                # Blocks this thread only, the image is then safe to use on any stream
+                stream.synchronize()
+                return image
+            except Exception as e:
+                logger.warning(f"GPU JPEG decode failed, falling back to CPU: {e}")
+        return TF.pil_to_tensor(self.load_image_bytes(data))
+    
+    def preprocess(self, image: Union[Image.Image, torch.Tensor]) -> Tuple[Any, Tuple[int, int]]:
+        """
+        Resize and normalize a single image for batched inference
+        
+        Args:
+            image: RGB PIL image or uint8 tensor of shape [3, H, W]
+            
+        Returns:
+            Tuple of (pixel_values: Tensor [3, H, W] on the model device, target_size: (height, width)).
+            For the yolov8n backend pixel_values is an HWC BGR array, ultralytics letterboxes it itself.
+        """
+        if isinstance(image, Image.Image):
+            image = TF.pil_to_tensor(image)
+        target_size = tuple(image.shape[-2:])
+        
+        if self.model_backend == "yolov8n":
+            return np.ascontiguousarray(image.permute(1, 2, 0).cpu().numpy()[..., ::-1]), target_size
+        
+        stream = self._side_stream()
+        if stream is None:
+            return self._resize_and_normalize(image.to(self.device)), target_size
+        
+        # Pinned memory lets the copy run asynchronously; PyTorch's caching host
+        # allocator recycles the pinned blocks across requests
+        if image.device.type == "cpu":
+            image = image.pin_memory()
+        # Never ordered after the default stream, where inference is queued
+        with torch.cuda.stream(stream):
+            pixel_values = self._resize_and_normalize(image.to(self.device, non_blocking=True))
+        # Only the calling thread waits, and only for its own stream
+        stream.synchronize()
+        return pixel_values, target_size
+    
+    def _side_stream(self) -> Optional[torch.cuda.Stream]:
+        """This thread's stream for decoding and preprocessing, None on CPU"""
+        if self._streams is None:
+            return None
+        if not hasattr(self._streams, "stream"):
+            self._streams.stream = torch.cuda.Stream(self.device)
+        return self._streams.stream
+    
+    def _resize_and_normalize(self, image: torch.Tensor) -> torch.Tensor:
+        size = self.processor.size
+        if "shortest_edge" in size:
+            # DETR keeps the aspect ratio, use its own rounding so output sizes match the processor
+            height, width = get_size_with_aspect_ratio(
+                tuple(image.shape[-2:]), size["shortest_edge"], size["longest_edge"]
+            )
+            image = TF.resize(image, size=[height, width], antialias=True)
+        else:
+            # RT-DETR uses a fixed input size
+            image = TF.resize(image, size=[size["height"], size["width"]], antialias=True)
+        return self._normalize(image)
+    
+    @staticmethod
+    def _pad_batch(pixel_values: List[torch.Tensor]) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        """Pad images to the largest height/width in the batch, the mask hides the padding"""
+        if len(pixel_values) == 1:
+            return pixel_values[0].unsqueeze(0), None
+        
+        height = max(pv.shape[-2] for pv in pixel_values)
+        width = max(pv.shape[-1] for pv in pixel_values)
+        batch = pixel_values[0].new_zeros((len(pixel_values), 3, height, width))
+        pixel_mask = torch.zeros((len(pixel_values), height, width), dtype=torch.long, device=batch.device)
+        for i, pv in enumerate(pixel_values):
+            batch[i, :, :pv.shape[-2], :pv.shape[-1]] = pv
+            pixel_mask[i, :pv.shape[-2], :pv.shape[-1]] = 1
+        return batch, pixel_mask
+    
+    def _postprocess(self, outputs, target_sizes: torch.Tensor) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Convert raw model outputs into per-image car detections
+        
+        Args:
+            outputs: Model outputs exposing logits and pred_boxes
+            target_sizes: Tensor of original (height, width) per image
+            
+        Returns:
+            List of (has_cars, detections) tuples, one per image
+        """
+        # Score only the car column instead of post-processing all classes
+        if self.model_backend == "rtdetr-r18":
+            # RT-DETR scores each class independently, there is no "no object" class
+            car_probs = outputs.logits[..., self._car_label_id].sigmoid()
+            keep = car_probs > self.confidence_threshold
+        else:
+            probs = outputs.logits.softmax(-1)
+            car_probs = probs[..., self._car_label_id]
+            keep = car_probs > self.confidence_threshold
+            if self.confidence_threshold < 0.5:
+                # Above 0.5 a kept car is necessarily the most likely class
+                keep &= probs[..., :-1].argmax(-1) == self._car_label_id
+        
+        # Gather the kept queries on the device so only car rows are converted and copied
+        image_idx, query_idx = keep.nonzero(as_tuple=True)
+        car_probs = car_probs[image_idx, query_idx]
+        
+        # Relative (cx, cy, w, h) to absolute (x1, y1, x2, y2) for all kept boxes in one op
+        x_c, y_c, w, h = outputs.pred_boxes[image_idx, query_idx].unbind(-1)
+        boxes = torch.stack([x_c - 0.5 * w, y_c - 0.5 * h, x_c + 0.5 * w, y_c + 0.5 * h], dim=-1)
+        img_h, img_w = target_sizes.to(boxes.device).unbind(1)
+        scale = torch.stack([img_w, img_h, img_w, img_h], dim=1).to(boxes)
+        boxes = boxes * scale[image_idx]
+        
+        # One device-to-host copy per tensor, then split per image on the host
+        splits = torch.bincount(image_idx, minlength=len(keep)).cumsum(0)[:-1].cpu().numpy()
+        car_probs = np.split(car_probs.cpu().numpy(), splits)
+        boxes = np.split(boxes.cpu().numpy(), splits)
+        
+        return [
+            self._make_detections(scores, image_boxes)
+            for scores, image_boxes in zip(car_probs, boxes)
+        ]
+    
+    def _detect_yolo_batch(self, images: List[np.ndarray]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """Run the ultralytics model, which only keeps confident cars itself"""
+        results = self.model(
+            images,
+            classes=[self._car_label_id],
+            conf=self.confidence_threshold,
+            half=self.device.type == "cuda",
+            verbose=False
+        )
+        return [
+            self._make_detections(result.boxes.conf.cpu().numpy(), result.boxes.xyxy.cpu().numpy())
+            for result in results
+        ]
+    
+    @staticmethod
+    def _make_detections(scores: np.ndarray, boxes: np.ndarray) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Build the (has_cars, detections) result from the kept car scores and xyxy boxes
+        
+        Detections are stored as columns, so no per-detection dict is built and the
+        "label"/"bbox_format" strings are not repeated for every car.
+        """
+        detections = {
+            "count": len(scores),
+            "bbox_format": "xyxy",  # x1, y1, x2, y2
+            "scores": scores.tolist(),
+            "boxes": boxes.tolist()
+        }
+        return detections["count"] > 0, detections
+    
+    @staticmethod
+    def to_records(detections: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert columnar detections to the list of per-car dicts"""
+        return [
+            {
+                "label": "car",
+                "confidence": score,
+                "bbox": box,
+                "bbox_format": detections["bbox_format"]
+            }
+            for score, box in zip(detections["scores"], detections["boxes"])
+        ]
+    
+    @staticmethod
+    def cache_key(data: bytes) -> bytes:
+        """Digest identifying an encoded image in the result cache"""
+        return xxhash.xxh3_128_digest(data)
+    
+    def cache_get(self, key: bytes) -> Optional[Tuple[bool, Dict[str, Any]]]:
+        """Return the cached (has_cars, detections) for an image digest, None on a miss"""
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            return self._cache.get(key)
+    
+    def cache_put(self, key: bytes, result: Tuple[bool, Dict[str, Any]]):
+        """Store the (has_cars, detections) result of an image digest"""
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = result
+    
     def detect_cars(self, image_path: str) -> Tuple[bool, List[Dict[str, Any]]]:
         """
         Detect cars in an image
@@ -50,51 +647,103 @@ class CarDetector:
         Returns:
             Tuple of (has_cars: bool, detections: List[Dict])
         """
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        return self.detect_cars_from_image(self.load_image(image_path))
+    
+    def detect_cars_soa(self, image_path: str) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Detect cars in an image, returning the detections as columns
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Tuple of (has_cars: bool, detections: Dict) where detections holds
+            count, bbox_format, scores and boxes
+        """
+        return self._detect_soa(self.load_image(image_path))
+    
+    def detect_cars_from_bytes(self, data: bytes) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Detect cars in an encoded image held in memory
+        
+        Args:
+            data: Encoded image bytes (JPEG, PNG, ...)
+            
+        Returns:
+            Tuple of (has_cars: bool, detections: List[Dict])
+        """
+        key = self.cache_key(data)
+        result = self.cache_get(key)
+        if result is None:
+            result = self._detect_soa(self.decode_image(data))
+            self.cache_put(key, result)
+        
+        has_cars, detections = result
+        return has_cars, self.to_records(detections)
+    
+    def detect_cars_from_image(self, image: Union[Image.Image, torch.Tensor]) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Detect cars in a decoded image
         
+        Args:
+            image: RGB PIL image or uint8 tensor of shape [3, H, W]
+            
+        Returns:
+            Tuple of (has_cars: bool, detections: List[Dict])
+        """
+        has_cars, detections = self._detect_soa(image)
+        return has_cars, self.to_records(detections)
+    
+    def _detect_soa(self, image: Union[Image.Image, torch.Tensor]) -> Tuple[bool, Dict[str, Any]]:
+        """Run preprocessing and a single-image batch, returning columnar detections"""
         try:
-            # Load and process image
-            image = Image.open(image_path)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            inputs = self.processor(images=image, return_tensors="pt")
-            
-            # Run inference
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            # Post-process results
-            target_sizes = torch.tensor([image.size[::-1]])
-            results = self.processor.post_process_object_detection(
-                outputs, 
-                target_sizes=target_sizes, 
-                threshold=self.confidence_threshold
-            )[0]
-            
-            # Extract car detections
-            car_detections = []
-            has_cars = False
-            
-            for score, label, box in zip(results["scores"], results["labels"], results["boxes"]):
-                label_name = self.model.config.id2label[label.item()]
-                if label_name == "car":
-                    has_cars = True
-                    car_detections.append({
-                        "label": label_name,
-                        "confidence": score.item(),
-                        "bbox": box.tolist(),
-                        "bbox_format": "xyxy"  # x1, y1, x2, y2
-                    })
-            
-            logger.info(f"Detected {len(car_detections)} cars in {image_path}")
-            return has_cars, car_detections
+            pixel_values, target_size = self.preprocess(image)
+            has_cars, detections = self.detect_cars_batch([pixel_values], [target_size])[0]
+            
+            logger.info(f"Detected {detections['count']} cars in {target_size[1]}x{target_size[0]} image")
+            return has_cars, detections
             
         except Exception as e:
-            logger.error(f"Error processing image {image_path}: {e}")
+            logger.error(f"Error processing image: {e}")
             raise
     
+    def detect_cars_batch(self, pixel_values: List[torch.Tensor],
+                          target_sizes: List[Tuple[int, int]]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Detect cars in a batch of preprocessed images with a single forward pass
+        
+        Args:
+            pixel_values: Preprocessed images as returned by preprocess, shapes may differ
+            target_sizes: Original (height, width) of each image
+            
+        Returns:
+            List of (has_cars, detections) tuples, one per image, with columnar
+            detections (see to_records for the per-car dict layout)
+        """
+        if len(pixel_values) > self.max_batch_size:
+            n = self.max_batch_size
+            return [
+                result
+                for start in range(0, len(pixel_values), n)
+                for result in self.detect_cars_batch(pixel_values[start:start + n], target_sizes[start:start + n])
+            ]
+        
+        if self.model_backend == "yolov8n":
+            results = self._detect_yolo_batch(pixel_values)
+            logger.info(f"Detected cars in batch of {len(results)} images")
+            return results
+        
+        if self._streams is not None:
+            # Allocated on side streams, tell the allocator they are used on this one too
+            for pv in pixel_values:
+                pv.record_stream(torch.cuda.current_stream())
+        
+        batch, pixel_mask = self._pad_batch(pixel_values)
+        outputs = self._forward(batch, pixel_mask)
+        results = self._postprocess(outputs, torch.tensor(target_sizes))
+        logger.info(f"Detected cars in batch of {len(results)} images")
+        return results
+    
     def detect_car_simple(self, image_path: str) -> bool:
         """
         Simple car detection that returns only boolean result
@@ -113,5 +762,6 @@ class CarDetector:
         return {
             "model_name": self.model_name,
             "confidence_threshold": self.confidence_threshold,
-            "available_labels": list(self.model.config.id2label.values()) if self.model else None
+            "model_backend": self.model_backend,
+            "available_labels": list(self.id2label.values()) if self.id2label else None
         }
\ No newline at end of file
@@ -0,0 +1,286 @@
+"""
+TensorRT engine export and inference for the DETR model
+"""
+from collections import namedtuple
+from typing import Callable, Iterable, Optional, Tuple
+import logging
+import os
+import re
+
+import torch
+
+try:
+    import tensorrt as trt
+except ImportError:  # TensorRT is optional, the detector falls back to PyTorch
+    trt = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Mirrors the attributes of DetrObjectDetectionOutput used by the post-processor
+DetrOutputs = namedtuple("DetrOutputs", ["logits", "pred_boxes"])
+
+# Optimization profile for the dynamic pixel_values input (batch, height, width),
+# pixel_mask uses the same batch and spatial dimensions
+MIN_SHAPE = (1, 3, 320, 320)
+OPT_SHAPE = (1, 3, 800, 1066)
+MAX_SHAPE = (8, 3, 1333, 1333)
+MAX_BATCH_SIZE = MAX_SHAPE[0]
+
+
+def is_available() -> bool:
+    """Check whether TensorRT inference can run in this environment"""
+    return trt is not None and torch.cuda.is_available()
+
+
+def mask_shape(shape: Tuple[int, ...]) -> Tuple[int, int, int]:
+    """pixel_mask shape matching a pixel_values shape"""
+    return (shape[0], *shape[2:])
+
+
+def calibration_cache_path(model_name: str, cache_dir: str) -> str:
+    """Location of the INT8 calibration table that goes with the INT8 engine"""
+    return os.path.splitext(engine_cache_path(model_name, cache_dir, precision="int8"))[0] + ".calib"
+
+
+def engine_cache_path(model_name: str, cache_dir: str, precision: str = "fp16") -> str:
+    """
+    Build the on-disk location of a serialized engine
+
+    Engines are only valid for the GPU and TensorRT version that built them,
+    so both are part of the cache key.
+
+    Args:
+        model_name: HuggingFace model identifier
+        cache_dir: Directory where engines are stored
+        precision: Precision the engine was built with
+
+    Returns:
+        Path to the serialized engine file
+    """
+    # "masked" marks engines taking pixel_mask, older pixel_values-only engines are rebuilt
+    key = f"{model_name}_{torch.cuda.get_device_name()}_trt{trt.__version__}_{precision}_masked"
+    key = re.sub(r"[^A-Za-z0-9._-]+", "_", key)
+    return os.path.join(cache_dir, f"{key}.engine")
+
+
+class _DetrExportWrapper(torch.nn.Module):
+    """Expose DETR as a plain tensor-in / tensors-out module for ONNX export"""
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor,
+                pixel_mask: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        outputs = self.model(pixel_values=pixel_values, pixel_mask=pixel_mask)
+        return outputs.logits, outputs.pred_boxes
+
+
+def export_onnx(model: torch.nn.Module, onnx_path: str):
+    """
+    Export the DETR model to ONNX with dynamic batch and spatial axes
+
+    The padding mask is an input so images padded into a mixed-size batch are
+    still predicted relative to their own extent.
+
+    Args:
+        model: Loaded DetrForObjectDetection model
+        onnx_path: Destination path of the ONNX file
+    """
+    param = next(model.parameters())
+    dummy_pixel_values = torch.randn(*OPT_SHAPE, device=param.device, dtype=param.dtype)
+    dummy_pixel_mask = torch.ones(mask_shape(OPT_SHAPE), device=param.device, dtype=torch.int32)
+    torch.onnx.export(
+        _DetrExportWrapper(model).eval(),
+        (dummy_pixel_values, dummy_pixel_mask),
+        onnx_path,
+        input_names=["pixel_values", "pixel_mask"],
+        output_names=["logits", "pred_boxes"],
+        opset_version=17,
+        dynamic_axes={
+            "pixel_values": {0: "B", 2: "H", 3: "W"},
+            "pixel_mask": {0: "B", 1: "H", 2: "W"},
+            "logits": {0: "B"},
+            "pred_boxes": {0: "B"},
+        },
+    )
+
+
+def make_calibrator(load_batches: Callable[[], Iterable[torch.Tensor]], cache_path: str):
+    """
+    Create an INT8 entropy calibrator
+
+    Args:
+        load_batches: Returns (pixel_values, pixel_mask) calibration batches of shape
+            OPT_SHAPE, only called when no calibration table is cached yet
+        cache_path: Where the calibration table is read from and written to
+
+    Returns:
+        trt.IInt8EntropyCalibrator2 instance
+    """
+
+    class EntropyCalibrator(trt.IInt8EntropyCalibrator2):
+        def __init__(self):
+            super().__init__()
+            self._batches = None
+            self._current = None
+
+        def get_batch_size(self):
+            return OPT_SHAPE[0]
+
+        def get_batch(self, names):
+            if self._batches is None:
+                self._batches = iter(load_batches())
+            try:
+                pixel_values, pixel_mask = next(self._batches)
+            except StopIteration:
+                return None
+            # Keep references so the device memory stays valid while TensorRT reads it
+            self._current = {
+                "pixel_values": pixel_values.to("cuda", dtype=torch.float32).contiguous(),
+                "pixel_mask": pixel_mask.to("cuda", dtype=torch.int32).contiguous(),
+            }
+            return [self._current[name].data_ptr() for name in names]
+
+        def read_calibration_cache(self):
+            if os.path.exists(cache_path):
+                with open(cache_path, "rb") as f:
+                    return f.read()
+            return None
+
+        def write_calibration_cache(self, cache):
+            with open(cache_path, "wb") as f:
+                f.write(bytes(cache))
+
+    return EntropyCalibrator()
+
+
+def build_engine(onnx_path: str, fp16: bool = True, calibrator=None) -> bytes:
+    """
+    Build a serialized TensorRT engine from an ONNX file
+
+    Args:
+        onnx_path: Path to the exported ONNX model
+        fp16: Allow TensorRT to pick FP16 kernels
+        calibrator: INT8 calibrator, enables INT8 kernels when given
+
+    Returns:
+        Serialized engine
+    """
+    trt_logger = trt.Logger(trt.Logger.WARNING)
+    builder = trt.Builder(trt_logger)
+    network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+    parser = trt.OnnxParser(network, trt_logger)
+
+    with open(onnx_path, "rb") as f:
+        if not parser.parse(f.read()):
+            errors = [str(parser.get_error(i)) for i in range(parser.num_errors)]
+            raise RuntimeError(f"Failed to parse ONNX model: {'; '.join(errors)}")
+
+    config = builder.create_builder_config()
+    config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, 1 << 30)
+    if fp16:
+        config.set_flag(trt.BuilderFlag.FP16)
+
+    profile = builder.create_optimization_profile()
+    profile.set_shape("pixel_values", MIN_SHAPE, OPT_SHAPE, MAX_SHAPE)
+    profile.set_shape("pixel_mask", mask_shape(MIN_SHAPE), mask_shape(OPT_SHAPE), mask_shape(MAX_SHAPE))
+    config.add_optimization_profile(profile)
+
+    if calibrator is not None:
+        # Layers TensorRT cannot run in INT8 (e.g. softmax) keep using FP16 kernels
+        config.set_flag(trt.BuilderFlag.INT8)
+        config.int8_calibrator = calibrator
+        config.set_calibration_profile(profile)
+
+    serialized = builder.build_serialized_network(network, config)
+    if serialized is None:
+        raise RuntimeError("TensorRT engine build failed")
+    return bytes(serialized)
+
+
+def load_or_build_engine(model: torch.nn.Module, model_name: str, cache_dir: str,
+                         calibrator=None) -> bytes:
+    """
+    Return the cached engine for this model/GPU/TensorRT combination, building it if needed
+
+    Args:
+        model: Loaded DetrForObjectDetection model
+        model_name: HuggingFace model identifier
+        cache_dir: Directory where ONNX files and engines are stored
+        calibrator: INT8 calibrator, builds an INT8 engine when given
+
+    Returns:
+        Serialized engine
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    precision = "int8" if calibrator is not None else "fp16"
+    engine_path = engine_cache_path(model_name, cache_dir, precision=precision)
+
+    if os.path.exists(engine_path):
+        logger.info(f"Loading cached TensorRT engine: {engine_path}")
+        with open(engine_path, "rb") as f:
+            return f.read()
+
+    onnx_path = os.path.splitext(engine_path)[0] + ".onnx"
+    logger.info(f"Exporting ONNX model to {onnx_path}")
+    export_onnx(model, onnx_path)
+
+    logger.info("Building TensorRT engine (this only happens once per GPU)")
+    engine_bytes = build_engine(onnx_path, calibrator=calibrator)
+    with open(engine_path, "wb") as f:
+        f.write(engine_bytes)
+    return engine_bytes
+
+
+class TrtRunner:
+    """Run DETR inference through a deserialized TensorRT engine"""
+
+    def __init__(self, engine_bytes: bytes):
+        """
+        Initialize the runner
+
+        Args:
+            engine_bytes: Serialized TensorRT engine
+        """
+        self._runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+        self.engine = self._runtime.deserialize_cuda_engine(engine_bytes)
+        if self.engine is None:
+            raise RuntimeError("Failed to deserialize TensorRT engine")
+        self.context = self.engine.create_execution_context()
+
+    def __call__(self, pixel_values: torch.Tensor, pixel_mask: Optional[torch.Tensor] = None) -> DetrOutputs:
+        """
+        Run inference on a batch of preprocessed images
+
+        Args:
+            pixel_values: Tensor of shape [B, 3, H, W], B at most MAX_BATCH_SIZE
+            pixel_mask: Padding mask of shape [B, H, W], all ones if None
+
+        Returns:
+            DetrOutputs with logits and pred_boxes tensors
+        """
+        if pixel_values.shape[0] > MAX_BATCH_SIZE:
+            raise ValueError(f"Batch of {pixel_values.shape[0]} exceeds the engine maximum of {MAX_BATCH_SIZE}")
+        pixel_values = pixel_values.to("cuda", dtype=torch.float32).contiguous()
+        if pixel_mask is None:
+            pixel_mask = torch.ones(mask_shape(pixel_values.shape), device="cuda", dtype=torch.int32)
+        pixel_mask = pixel_mask.to("cuda", dtype=torch.int32).contiguous()
+        for name, tensor in (("pixel_values", pixel_values), ("pixel_mask", pixel_mask)):
+            self.context.set_input_shape(name, tuple(tensor.shape))
+            self.context.set_tensor_address(name, tensor.data_ptr())
+
+        outputs = {}
+        for name in DetrOutputs._fields:
+            shape = tuple(self.context.get_tensor_shape(name))
+            outputs[name] = torch.empty(shape, device="cuda", dtype=torch.float32)
+            self.context.set_tensor_address(name, outputs[name].data_ptr())
+
+        stream = torch.cuda.current_stream()
+        if not self.context.execute_async_v3(stream.cuda_stream):
+            raise RuntimeError("TensorRT inference failed")
+        stream.synchronize()
+
+        return DetrOutputs(**outputs)
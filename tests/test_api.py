@@ -4,14 +4,15 @@ Tests for the FastAPI application
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
-import tempfile
-import os
 from PIL import Image
 import io
 
 # Import the app
 from src.api import app
 
+NO_DETECTIONS = {"count": 0, "bbox_format": "xyxy", "scores": [], "boxes": []}
+ONE_CAR = {"count": 1, "bbox_format": "xyxy", "scores": [0.95], "boxes": [[1, 2, 3, 4]]}
+
 class TestCarDetectionAPI:
     """Test cases for the Car Detection API"""
     
@@ -33,7 +34,8 @@ class TestCarDetectionAPI:
         
         return img_byte_arr
     
-    def test_root_endpoint(self, client):
+    @patch('src.api.detector')
+    def test_root_endpoint(self, mock_detector, client):
         """Test the root health check endpoint"""
         response = client.get("/")
         assert response.status_code == 200
@@ -41,6 +43,35 @@ class TestCarDetectionAPI:
         assert data["message"] == "Car Detection API is running"
         assert data["status"] == "healthy"
     
+    @patch('src.api.detector', None)
+    def test_root_endpoint_not_ready(self, client):
+        """Test that the health check fails while no model is loaded"""
+        response = client.get("/")
+        assert response.status_code == 503
+        assert "Model not loaded" in response.json()["detail"]
+    
+    @patch('src.api.detector', None)
+    @patch('src.api.CarDetector')
+    def test_lifespan_initializes_detector(self, mock_detector_class):
+        """Test that the detector is loaded on startup and released on shutdown"""
+        import src.api
+        import threading
+        
+        init_thread = []
+        mock_detector_class.side_effect = lambda **kwargs: (
+            init_thread.append(threading.get_ident()) or mock_detector_class.return_value
+        )
+        
+        with TestClient(app) as client:
+            assert src.api.detector is mock_detector_class.return_value
+            # Created on the inference thread, where its compiled CUDA graphs are replayed
+            assert src.api.inference_pool.submit(threading.get_ident).result() == init_thread[0]
+            assert src.api.scheduler is not None
+            assert client.get("/").status_code == 200
+        
+        assert src.api.scheduler is None
+        mock_detector_class.return_value.save_compile_cache.assert_called_once()
+    
     @patch('src.api.detector')
     def test_model_info_endpoint(self, mock_detector, client):
         """Test the model info endpoint"""
@@ -61,14 +92,14 @@ class TestCarDetectionAPI:
     def test_detect_car_endpoint_success(self, mock_detector, client, sample_image_file):
         """Test successful car detection"""
         # Mock detector response
-        mock_detector.detect_cars.return_value = (True, [
-            {
-                "label": "car",
-                "confidence": 0.95,
-                "bbox": [100, 100, 200, 200],
-                "bbox_format": "xyxy"
-            }
-        ])
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.return_value = [(True, {
+            "count": 1,
+            "bbox_format": "xyxy",
+            "scores": [0.95],
+            "boxes": [[100, 100, 200, 200]]
+        })]
         mock_detector.model_name = "facebook/detr-resnet-50"
         mock_detector.confidence_threshold = 0.9
         
@@ -84,12 +115,15 @@ class TestCarDetectionAPI:
         assert data["car_count"] == 1
         assert len(data["detections"]) == 1
         assert data["detections"][0]["label"] == "car"
+        assert data["detections"][0]["bbox"] == [100, 100, 200, 200]
     
     @patch('src.api.detector')
     def test_detect_car_endpoint_no_cars(self, mock_detector, client, sample_image_file):
         """Test car detection when no cars are present"""
         # Mock detector response
-        mock_detector.detect_cars.return_value = (False, [])
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.return_value = [(False, NO_DETECTIONS)]
         mock_detector.model_name = "facebook/detr-resnet-50"
         mock_detector.confidence_threshold = 0.9
         
@@ -105,11 +139,32 @@ class TestCarDetectionAPI:
         assert data["car_count"] == 0
         assert len(data["detections"]) == 0
     
+    @patch('src.api.detector')
+    def test_detect_car_soa_layout(self, mock_detector, client, sample_image_file):
+        """Test that layout=soa returns the detections as columns"""
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.return_value = [(True, ONE_CAR)]
+        mock_detector.model_name = "facebook/detr-resnet-50"
+        mock_detector.confidence_threshold = 0.9
+        
+        response = client.post(
+            "/detect-car?layout=soa",
+            files={"file": ("test.jpg", sample_image_file, "image/jpeg")}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["car_count"] == 1
+        assert data["detections"] == ONE_CAR
+    
     @patch('src.api.detector')
     def test_detect_car_simple_endpoint(self, mock_detector, client, sample_image_file):
         """Test simple car detection endpoint"""
         # Mock detector response
-        mock_detector.detect_car_simple.return_value = True
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.return_value = [(True, ONE_CAR)]
         
         # Make request
         response = client.post(
@@ -122,7 +177,8 @@ class TestCarDetectionAPI:
         assert data["car_detected"] is True
         assert data["filename"] == "test.jpg"
     
-    def test_invalid_file_type(self, client):
+    @patch('src.api.detector')
+    def test_invalid_file_type(self, mock_detector, client):
         """Test uploading non-image file"""
         # Create a text file
         text_content = b"This is not an image"
@@ -150,7 +206,9 @@ class TestCarDetectionAPI:
     def test_detection_error_handling(self, mock_detector, client, sample_image_file):
         """Test error handling during detection"""
         # Mock detector to raise an exception
-        mock_detector.detect_cars.side_effect = Exception("Processing error")
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.side_effect = Exception("Processing error")
         
         response = client.post(
             "/detect-car",
@@ -158,4 +216,71 @@ class TestCarDetectionAPI:
         )
         
         assert response.status_code == 500
-        assert "Error processing image" in response.json()["detail"]
\ No newline at end of file
+        assert "Error processing image" in response.json()["detail"]
+    
+    @patch('src.api.detector')
+    def test_detect_cars_batch_endpoint(self, mock_detector, client, sample_image_file):
+        """Test batched detection over several uploaded images"""
+        # Mock detector response
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.return_value = [
+            (True, ONE_CAR),
+            (False, NO_DETECTIONS)
+        ]
+        mock_detector.model_name = "facebook/detr-resnet-50"
+        mock_detector.confidence_threshold = 0.9
+        
+        image_bytes = sample_image_file.getvalue()
+        response = client.post(
+            "/detect-cars-batch",
+            files=[
+                ("files", ("a.jpg", io.BytesIO(image_bytes), "image/jpeg")),
+                ("files", ("b.jpg", io.BytesIO(image_bytes), "image/jpeg"))
+            ]
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["filename"] for r in results] == ["a.jpg", "b.jpg"]
+        assert results[0]["has_cars"] is True
+        assert results[0]["car_count"] == 1
+        assert results[1]["has_cars"] is False
+        mock_detector.detect_cars_batch.assert_called_once()
+    
+    @patch('src.api.BATCH_MAX_SIZE', 2)
+    @patch('src.api.detector')
+    def test_large_batch_is_preprocessed_in_chunks(self, mock_detector, client, sample_image_file):
+        """Test that a large upload is preprocessed and run one batch at a time"""
+        mock_detector.cache_get.return_value = None
+        mock_detector.preprocess.return_value = (Mock(), (100, 100))
+        mock_detector.detect_cars_batch.side_effect = lambda pixel_values, sizes: [(False, NO_DETECTIONS)] * len(sizes)
+        mock_detector.model_name = "facebook/detr-resnet-50"
+        mock_detector.confidence_threshold = 0.9
+        
+        image_bytes = sample_image_file.getvalue()
+        response = client.post(
+            "/detect-cars-batch",
+            files=[("files", (f"{i}.jpg", io.BytesIO(image_bytes), "image/jpeg")) for i in range(5)]
+        )
+        
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 5
+        batch_sizes = [len(call.args[1]) for call in mock_detector.detect_cars_batch.call_args_list]
+        assert batch_sizes == [2, 2, 1]
+    
+    @patch('src.api.detector')
+    def test_cached_result_skips_inference(self, mock_detector, client, sample_image_file):
+        """Test that a cache hit is returned without preprocessing or inference"""
+        mock_detector.cache_get.return_value = (True, ONE_CAR)
+        
+        response = client.post(
+            "/detect-car-simple",
+            files={"file": ("test.jpg", sample_image_file, "image/jpeg")}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["car_detected"] is True
+        mock_detector.preprocess.assert_not_called()
+        mock_detector.detect_cars_batch.assert_not_called()
+        mock_detector.cache_put.assert_not_called()
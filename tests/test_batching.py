@@ -0,0 +1,63 @@
+"""
+Tests for the BatchScheduler
+"""
+import asyncio
+import pytest
+from unittest.mock import Mock
+from src.batching import BatchScheduler
+
+class TestBatchScheduler:
+    """Test cases for BatchScheduler"""
+    
+    @pytest.fixture
+    def mock_detector(self):
+        """Create a detector mock that echoes the target size of each image"""
+        detector = Mock()
+        detector.detect_cars_batch.side_effect = lambda pixel_values, target_sizes: [
+            (True, [{"size": size}]) for size in target_sizes
+        ]
+        return detector
+    
+    def test_concurrent_requests_are_coalesced(self, mock_detector):
+        """Test that concurrent submissions share one forward pass"""
+        async def run():
+            scheduler = BatchScheduler(mock_detector, max_batch=8, max_delay_ms=50)
+            scheduler.start()
+            results = await asyncio.gather(
+                *(scheduler.submit(Mock(), (i, i)) for i in range(3))
+            )
+            await scheduler.stop()
+            return results
+        
+        results = asyncio.run(run())
+        
+        assert mock_detector.detect_cars_batch.call_count == 1
+        assert [r[1][0]["size"] for r in results] == [(0, 0), (1, 1), (2, 2)]
+    
+    def test_batch_size_is_capped(self, mock_detector):
+        """Test that batches never exceed max_batch"""
+        async def run():
+            scheduler = BatchScheduler(mock_detector, max_batch=2, max_delay_ms=50)
+            scheduler.start()
+            await asyncio.gather(*(scheduler.submit(Mock(), (i, i)) for i in range(5)))
+            await scheduler.stop()
+        
+        asyncio.run(run())
+        
+        batch_sizes = [len(call.args[1]) for call in mock_detector.detect_cars_batch.call_args_list]
+        assert batch_sizes == [2, 2, 1]
+    
+    def test_errors_propagate_to_callers(self, mock_detector):
+        """Test that a failed batch raises in every waiting request"""
+        mock_detector.detect_cars_batch.side_effect = RuntimeError("CUDA error")
+        
+        async def run():
+            scheduler = BatchScheduler(mock_detector, max_delay_ms=1)
+            scheduler.start()
+            try:
+                await scheduler.submit(Mock(), (1, 1))
+            finally:
+                await scheduler.stop()
+        
+        with pytest.raises(RuntimeError, match="CUDA error"):
+            asyncio.run(run())
@@ -7,8 +7,29 @@ import os
 from PIL import Image
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
+import torch
 from src.car_detector import CarDetector
 
+def make_model_outputs(queries, image_size, num_labels=4):
+    """
+    Build DETR-style raw outputs for a single image
+    
+    Args:
+        queries: List of (label, score, xyxy box in pixels), one per query
+        image_size: (width, height) of the original image
+        num_labels: Number of classes, the extra last logit is "no object"
+    """
+    width, height = image_size
+    probs = torch.full((1, len(queries), num_labels + 1), 1e-9, dtype=torch.float64)
+    boxes = torch.zeros((1, len(queries), 4))
+    for i, (label, score, (x1, y1, x2, y2)) in enumerate(queries):
+        probs[0, i, label] = score
+        probs[0, i, -1] = 1 - score
+        boxes[0, i] = torch.tensor([
+            (x1 + x2) / 2 / width, (y1 + y2) / 2 / height, (x2 - x1) / width, (y2 - y1) / height
+        ])
+    return Mock(logits=probs.log(), pred_boxes=boxes)
+
 class TestCarDetector:
     """Test cases for CarDetector"""
     
@@ -20,6 +41,9 @@ class TestCarDetector:
             
             # Mock processor
             mock_processor_instance = Mock()
+            mock_processor_instance.image_mean = [0.485, 0.456, 0.406]
+            mock_processor_instance.image_std = [0.229, 0.224, 0.225]
+            mock_processor_instance.size = {"shortest_edge": 800, "longest_edge": 1333}
             mock_processor.from_pretrained.return_value = mock_processor_instance
             
             # Mock model
@@ -57,24 +81,47 @@ class TestCarDetector:
         assert detector.processor is not None
         assert detector.model is not None
     
+    def test_weights_load_directly_on_device(self):
+        """Test that weights are streamed onto the model device when accelerate is available"""
+        with patch('src.car_detector.DetrImageProcessor') as mock_processor, \
+             patch('src.car_detector.DetrForObjectDetection') as mock_model, \
+             patch('src.car_detector.is_accelerate_available', return_value=True):
+            mock_processor.from_pretrained.return_value.do_normalize = False
+            mock_processor.from_pretrained.return_value.size = {"shortest_edge": 800, "longest_edge": 1333}
+            mock_model.from_pretrained.return_value.config.id2label = {2: 'car'}
+            detector = CarDetector()
+        
+        kwargs = mock_model.from_pretrained.call_args.kwargs
+        assert kwargs["low_cpu_mem_usage"] is True
+        assert kwargs["device_map"] == {"": detector.device}
+        assert kwargs["torch_dtype"] == detector.dtype
+    
+    def test_warmup_runs_at_load(self):
+        """Test that the model runs dummy forward passes before serving requests"""
+        with patch('src.car_detector.DetrImageProcessor') as mock_processor, \
+             patch('src.car_detector.DetrForObjectDetection') as mock_model:
+            mock_processor.from_pretrained.return_value.do_normalize = False
+            mock_processor.from_pretrained.return_value.size = {"shortest_edge": 800, "longest_edge": 1333}
+            model = mock_model.from_pretrained.return_value
+            model.config.id2label = {2: 'car'}
+            model.to.return_value.to.return_value.eval.return_value = model
+            with patch.object(CarDetector, 'preprocess', autospec=True,
+                              side_effect=CarDetector.preprocess) as mock_preprocess:
+                CarDetector()
+        
+        # The dummy image also goes through preprocessing, warming the compiled normalization
+        mock_preprocess.assert_called_once()
+        assert model.call_count == 3
+        assert model.call_args.kwargs["pixel_values"].shape == (1, 3, 800, 1066)
+    
     def test_detect_cars_with_car_present(self, mock_detector, sample_image):
         """Test car detection when car is present"""
         detector, mock_processor, mock_model = mock_detector
         
-        # Mock the model outputs
-        mock_outputs = Mock()
-        mock_model.return_value = mock_outputs
-        
-        # Mock post-processing results
-        mock_results = {
-            "scores": [0.95],  # High confidence
-            "labels": [2],     # Car label
-            "boxes": [[100, 100, 200, 200]]  # Bounding box
-        }
-        mock_processor.post_process_object_detection.return_value = [mock_results]
-        
-        # Mock processor input processing
-        mock_processor.return_value = {"pixel_values": Mock()}
+        # Mock the model outputs: one high confidence car
+        mock_model.return_value = make_model_outputs([
+            (2, 0.95, (100, 100, 200, 200))
+        ], image_size=(640, 480))
         
         # Test detection
         has_cars, detections = detector.detect_cars(sample_image)
@@ -82,27 +129,34 @@ class TestCarDetector:
         assert has_cars is True
         assert len(detections) == 1
         assert detections[0]["label"] == "car"
-        assert detections[0]["confidence"] == 0.95
-        assert detections[0]["bbox"] == [100, 100, 200, 200]
+        assert detections[0]["confidence"] == pytest.approx(0.95)
+        assert detections[0]["bbox"] == pytest.approx([100, 100, 200, 200])
+    
+    def test_detect_cars_soa(self, mock_detector, sample_image):
+        """Test that the columnar layout shares label and bbox format across cars"""
+        detector, _, mock_model = mock_detector
+        
+        mock_model.return_value = make_model_outputs([
+            (2, 0.95, (100, 100, 200, 200)),
+            (2, 0.93, (300, 300, 400, 400))
+        ], image_size=(640, 480))
+        
+        has_cars, detections = detector.detect_cars_soa(sample_image)
+        
+        assert has_cars is True
+        assert detections["count"] == 2
+        assert detections["bbox_format"] == "xyxy"
+        assert detections["scores"] == pytest.approx([0.95, 0.93])
+        assert detections["boxes"][1] == pytest.approx([300, 300, 400, 400])
     
     def test_detect_cars_no_car_present(self, mock_detector, sample_image):
         """Test car detection when no car is present"""
         detector, mock_processor, mock_model = mock_detector
         
-        # Mock the model outputs
-        mock_outputs = Mock()
-        mock_model.return_value = mock_outputs
-        
-        # Mock post-processing results with no cars
-        mock_results = {
-            "scores": [0.95],  # High confidence
-            "labels": [0],     # Person label (not car)
-            "boxes": [[100, 100, 200, 200]]
-        }
-        mock_processor.post_process_object_detection.return_value = [mock_results]
-        
-        # Mock processor input processing
-        mock_processor.return_value = {"pixel_values": Mock()}
+        # Mock the model outputs: a high confidence person, no cars
+        mock_model.return_value = make_model_outputs([
+            (0, 0.95, (100, 100, 200, 200))
+        ], image_size=(640, 480))
         
         # Test detection
         has_cars, detections = detector.detect_cars(sample_image)
@@ -110,6 +164,22 @@ class TestCarDetector:
         assert has_cars is False
         assert len(detections) == 0
     
+    def test_low_threshold_requires_car_to_be_top_class(self, mock_detector, sample_image):
+        """Test that with a low threshold a car is only reported when it is the most likely class"""
+        detector, _, mock_model = mock_detector
+        detector.confidence_threshold = 0.3
+        
+        outputs = make_model_outputs([(2, 0.4, (100, 100, 200, 200))], image_size=(640, 480))
+        # Same query is more likely a motorcycle than a car
+        outputs.logits[0, 0, 3] = torch.tensor(0.5).log()
+        outputs.logits[0, 0, -1] = torch.tensor(0.1).log()
+        mock_model.return_value = outputs
+        
+        has_cars, detections = detector.detect_cars(sample_image)
+        
+        assert has_cars is False
+        assert detections == []
+    
     def test_detect_car_simple(self, mock_detector, sample_image):
         """Test simple car detection method"""
         detector, mock_processor, mock_model = mock_detector
@@ -154,13 +224,7 @@ class TestCarDetector:
             gray_image.save(tmp_file.name)
             
             # Mock the model outputs
-            mock_outputs = Mock()
-            mock_model.return_value = mock_outputs
-            
-            # Mock post-processing results
-            mock_results = {"scores": [], "labels": [], "boxes": []}
-            mock_processor.post_process_object_detection.return_value = [mock_results]
-            mock_processor.return_value = {"pixel_values": Mock()}
+            mock_model.return_value = make_model_outputs([], image_size=(100, 100))
             
             # This should not raise an error
             has_cars, detections = detector.detect_cars(tmp_file.name)
@@ -168,26 +232,328 @@ class TestCarDetector:
             # Cleanup
             os.unlink(tmp_file.name)
     
+    def test_detect_cars_from_bytes(self, mock_detector):
+        """Test that in-memory images are decoded as RGB without touching disk"""
+        import io
+        detector, _, _ = mock_detector
+        
+        buffer = io.BytesIO()
+        Image.new('L', (64, 48), color=128).save(buffer, format='PNG')
+        
+        with patch.object(detector, '_detect_soa') as mock_detect:
+            mock_detect.return_value = (False, {"count": 0, "bbox_format": "xyxy", "scores": [], "boxes": []})
+            result = detector.detect_cars_from_bytes(buffer.getvalue())
+        
+        assert result == (False, [])
+        image = mock_detect.call_args.args[0]
+        assert image.dtype == torch.uint8
+        assert image.shape == (3, 48, 64)
+    
+    def test_preprocess_resizes_and_normalizes(self, mock_detector):
+        """Test that preprocessing matches DETR's resize and normalization"""
+        detector, _, _ = mock_detector
+        
+        image = Image.new('RGB', (640, 480), color=(124, 116, 104))
+        pixel_values, target_size = detector.preprocess(image)
+        
+        assert target_size == (480, 640)
+        assert pixel_values.shape == (3, 800, 1066)
+        assert pixel_values.dtype == detector.dtype
+        # The color is close to the ImageNet mean, so normalized values are near zero
+        assert pixel_values.float().abs().max() < 0.05
+        
+        # DETR rounds the capped short side to nearest, 333x1000 becomes 444x1333
+        pixel_values, _ = detector.preprocess(Image.new('RGB', (1000, 333)))
+        assert pixel_values.shape == (3, 444, 1333)
+    
+    def test_pad_batch(self, mock_detector):
+        """Test that batches of different sizes are padded with the padding masked"""
+        detector, _, _ = mock_detector
+        
+        batch, mask = detector._pad_batch([torch.ones(3, 800, 1066), torch.ones(3, 800, 600)])
+        
+        assert batch.shape == (2, 3, 800, 1066)
+        assert mask[0].all()
+        assert mask[1, :, :600].all()
+        assert not mask[1, :, 600:].any()
+        assert not batch[1, :, :, 600:].any()
+    
+    def test_detect_cars_from_bytes_is_cached(self, mock_detector):
+        """Test that the same image bytes only run detection once"""
+        detector, _, _ = mock_detector
+        
+        detections = {"count": 1, "bbox_format": "xyxy", "scores": [0.95], "boxes": [[1, 2, 3, 4]]}
+        with patch.object(detector, 'decode_image'), \
+             patch.object(detector, '_detect_soa') as mock_detect:
+            mock_detect.return_value = (True, detections)
+            first = detector.detect_cars_from_bytes(b"image")
+            second = detector.detect_cars_from_bytes(b"image")
+            detector.detect_cars_from_bytes(b"other image")
+        
+        assert first == second == (True, [
+            {"label": "car", "confidence": 0.95, "bbox": [1, 2, 3, 4], "bbox_format": "xyxy"}
+        ])
+        assert mock_detect.call_count == 2
+    
+    def test_side_streams_are_per_thread(self, mock_detector):
+        """Test that each preprocess thread gets its own CUDA side stream"""
+        import threading
+        detector, _, _ = mock_detector
+        detector._streams = threading.local()
+        
+        with patch('src.car_detector.torch.cuda.Stream', side_effect=lambda device: Mock()):
+            main_stream = detector._side_stream()
+            other = []
+            thread = threading.Thread(target=lambda: other.append(detector._side_stream()))
+            thread.start()
+            thread.join()
+        
+        assert detector._side_stream() is main_stream
+        assert other[0] is not main_stream
+    
+    def test_jpeg_bytes_use_turbojpeg(self, mock_detector):
+        """Test that JPEG uploads are decoded with TurboJPEG when it is available"""
+        import io
+        detector, _, _ = mock_detector
+        
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 48), color='red').save(buffer, format='JPEG')
+        detector._tj = Mock()
+        detector._tj.decode.return_value = np.zeros((48, 64, 3), dtype=np.uint8)
+        
+        image = detector.load_image_bytes(buffer.getvalue())
+        
+        detector._tj.decode.assert_called_once()
+        assert image.mode == 'RGB'
+        assert image.size == (64, 48)
+    
+    def test_forward_uses_tensorrt_runner(self, mock_detector):
+        """Test that inference goes through the TensorRT runner when one is loaded"""
+        detector, _, mock_model = mock_detector
+        
+        mock_runner = Mock()
+        mock_runner.return_value = Mock()
+        detector._trt_runner = mock_runner
+        pixel_values = Mock()
+        
+        outputs = detector._forward(pixel_values)
+        
+        assert outputs is mock_runner.return_value
+        mock_runner.assert_called_once_with(pixel_values.to.return_value, None)
+        # Only moved to the device, the engine does its own FP32 cast
+        pixel_values.to.assert_called_once_with(detector.device, non_blocking=True)
+        mock_model.assert_not_called()
+    
+    def test_calibration_batches_keep_aspect_ratio(self, mock_detector, tmp_path):
+        """Test that calibration images are letterboxed into the engine shape and non-images skipped"""
+        detector, _, _ = mock_detector
+        Image.new('RGB', (1000, 333)).save(tmp_path / "wide.png")
+        (tmp_path / "notes.txt").write_text("not an image")
+        detector.calibration_dir = str(tmp_path)
+        
+        batches = list(detector._calibration_batches())
+        
+        assert len(batches) == 1
+        pixel_values, pixel_mask = batches[0]
+        assert pixel_values.shape == (1, 3, 800, 1066)
+        assert pixel_mask.shape == (1, 800, 1066)
+        # 333x1000 scaled by 1066/1000 keeps its aspect ratio, the rest is padding
+        assert pixel_mask[0, :355].all() and not pixel_mask[0, 355:].any()
+    
+    def test_int8_tensorrt_requires_calibration_dir(self, mock_detector):
+        """Test that a missing calibration directory fails before the engine build"""
+        detector, _, _ = mock_detector
+        detector.quantize = True
+        detector.calibration_dir = None
+        
+        with patch('src.car_detector.trt_engine') as mock_trt:
+            mock_trt.calibration_cache_path.return_value = "/nonexistent/calib"
+            with pytest.raises(ValueError, match="calibration"):
+                detector._load_trt_engine()
+        mock_trt.load_or_build_engine.assert_not_called()
+    
+    def test_tensorrt_releases_pytorch_model(self):
+        """Test that the PyTorch model is not kept on the device once a TensorRT engine is loaded"""
+        with patch('src.car_detector.DetrImageProcessor') as mock_processor, \
+             patch('src.car_detector.DetrForObjectDetection') as mock_model, \
+             patch('src.car_detector.trt_engine') as mock_trt:
+            mock_processor.from_pretrained.return_value.do_normalize = False
+            mock_processor.from_pretrained.return_value.size = {"shortest_edge": 800, "longest_edge": 1333}
+            model = mock_model.from_pretrained.return_value
+            model.config.id2label = {2: 'car'}
+            mock_trt.MAX_BATCH_SIZE = 8
+            detector = CarDetector(use_tensorrt=True)
+        
+        assert detector.model is None
+        assert detector._trt_runner is mock_trt.TrtRunner.return_value
+        model.to.assert_not_called()
+        assert detector.get_model_info()["available_labels"] == ['car']
+    
+    def test_large_batches_are_split(self, mock_detector):
+        """Test that batches above max_batch_size run as several forward passes"""
+        detector, _, _ = mock_detector
+        detector.max_batch_size = 2
+        
+        with patch.object(detector, '_forward') as mock_forward, \
+             patch.object(detector, '_postprocess', side_effect=lambda outputs, sizes: [None] * len(sizes)):
+            results = detector.detect_cars_batch([torch.zeros(3, 8, 8)] * 5, [(8, 8)] * 5)
+        
+        assert len(results) == 5
+        assert [call.args[0].shape[0] for call in mock_forward.call_args_list] == [2, 2, 1]
+    
+    def test_compile_warms_up_every_batch_size(self, mock_detector):
+        """Test that compilation records every batch size the scheduler can send"""
+        detector, _, _ = mock_detector
+        detector.max_batch_size = 3
+        
+        with patch('src.car_detector.torch.compile', side_effect=lambda model, **kwargs: model), \
+             patch.object(detector, '_forward') as mock_forward:
+            detector._compile()
+        
+        warmed = {tuple(call.args[0].shape) for call in mock_forward.call_args_list}
+        assert warmed == {(b, 3, h, w) for b in (1, 2, 3) for h, w in [(800, 1333), (1333, 800), (1333, 1333)]}
+    
+    def test_compile_rtdetr_warms_up_fixed_shape(self, mock_detector):
+        """Test that RT-DETR is compiled on its fixed input size and caches per model"""
+        detector, mock_processor, _ = mock_detector
+        mock_processor.size = {"height": 640, "width": 640}
+        detector.model_backend = "rtdetr-r18"
+        detector.model_name = "PekingU/rtdetr_r18vd"
+        detector.max_batch_size = 1
+        
+        with patch('src.car_detector.torch.compile', side_effect=lambda model, **kwargs: model), \
+             patch.object(detector, '_forward') as mock_forward:
+            detector._compile()
+        
+        assert {tuple(call.args[0].shape) for call in mock_forward.call_args_list} == {(1, 3, 640, 640)}
+        assert os.path.basename(detector._compile_cache_path) == "PekingU_rtdetr_r18vd_compile.bin"
+    
+    def test_pad_to_static_shape(self, mock_detector):
+        """Test that compiled inputs are padded to a static shape with the padding masked"""
+        detector, _, _ = mock_detector
+        
+        pixel_values = torch.ones(1, 3, 800, 1066)
+        padded, mask = detector._pad_to_static_shape(pixel_values, None)
+        
+        assert padded.shape == (1, 3, 800, 1333)
+        assert mask.shape == (1, 800, 1333)
+        assert mask[0, :, :1066].all()
+        assert not mask[0, :, 1066:].any()
+        
+        portrait, _ = detector._pad_to_static_shape(torch.ones(1, 3, 1200, 800), None)
+        assert portrait.shape == (1, 3, 1333, 800)
+    
+    def test_mixed_orientation_batch_uses_square_bucket(self, mock_detector):
+        """Test that a batch mixing landscape and portrait images still gets a static shape"""
+        detector, _, _ = mock_detector
+        
+        batch, mask = detector._pad_batch([torch.ones(3, 800, 1066), torch.ones(3, 1200, 800)])
+        padded, mask = detector._pad_to_static_shape(batch, mask)
+        
+        assert padded.shape == (2, 3, 1333, 1333)
+        assert mask[0, :800, :1066].all() and not mask[0, 800:].any()
+        assert mask[1, :1200, :800].all() and not mask[1, :, 800:].any()
+    
+    def test_quantize_dynamic_only_ffn_layers(self, mock_detector):
+        """Test that only FFN linears are quantized, attention projections are left alone"""
+        detector, _, _ = mock_detector
+        
+        layer = torch.nn.Module()
+        layer.q_proj = torch.nn.Linear(8, 8)
+        layer.fc1 = torch.nn.Linear(8, 16)
+        layer.fc2 = torch.nn.Linear(16, 8)
+        detector.model = torch.nn.Sequential(layer)
+        detector.device = torch.device("cpu")
+        
+        detector._quantize_dynamic()
+        
+        quantized = detector.model[0]
+        assert isinstance(quantized.q_proj, torch.nn.Linear)
+        assert not isinstance(quantized.fc1, torch.nn.Linear)
+        assert not isinstance(quantized.fc2, torch.nn.Linear)
+    
     def test_multiple_cars_detection(self, mock_detector, sample_image):
         """Test detection of multiple cars"""
         detector, mock_processor, mock_model = mock_detector
         
-        # Mock the model outputs
-        mock_outputs = Mock()
-        mock_model.return_value = mock_outputs
-        
-        # Mock post-processing results with multiple cars
-        mock_results = {
-            "scores": [0.95, 0.87, 0.92],
-            "labels": [2, 2, 0],  # Two cars and one person
-            "boxes": [[100, 100, 200, 200], [300, 300, 400, 400], [500, 500, 600, 600]]
-        }
-        mock_processor.post_process_object_detection.return_value = [mock_results]
-        mock_processor.return_value = {"pixel_values": Mock()}
+        # Mock the model outputs: two cars, one person and a low confidence car
+        mock_model.return_value = make_model_outputs([
+            (2, 0.95, (100, 100, 200, 200)),
+            (2, 0.93, (300, 300, 400, 400)),
+            (0, 0.92, (500, 100, 600, 200)),
+            (2, 0.50, (10, 10, 50, 50))
+        ], image_size=(640, 480))
         
         # Test detection
         has_cars, detections = detector.detect_cars(sample_image)
         
         assert has_cars is True
-        assert len(detections) == 2  # Only cars, not person
-        assert all(d["label"] == "car" for d in detections)
\ No newline at end of file
+        assert len(detections) == 2  # Only confident cars, not person
+        assert all(d["label"] == "car" for d in detections)
+        assert detections[1]["bbox"] == pytest.approx([300, 300, 400, 400])
+    
+    def test_unknown_backend(self):
+        """Test that an unsupported backend is rejected"""
+        with pytest.raises(ValueError, match="Unknown model backend"):
+            CarDetector(model_backend="resnet-18")
+    
+    def test_rtdetr_backend_scores_with_sigmoid(self, sample_image):
+        """Test that RT-DETR logits are scored per class without a "no object" column"""
+        with patch('src.car_detector.RTDetrImageProcessor') as mock_processor, \
+             patch('src.car_detector.RTDetrForObjectDetection') as mock_model:
+            mock_processor_instance = Mock()
+            mock_processor_instance.do_normalize = False
+            mock_processor_instance.size = {"height": 640, "width": 640}
+            mock_processor.from_pretrained.return_value = mock_processor_instance
+            mock_model_instance = Mock()
+            mock_model_instance.config.id2label = {0: 'person', 1: 'bicycle', 2: 'car'}
+            mock_model.from_pretrained.return_value = mock_model_instance
+            
+            detector = CarDetector(model_backend="rtdetr-r18")
+            detector.model = mock_model_instance
+        
+        assert detector.model_name == "PekingU/rtdetr_r18vd"
+        logits = torch.full((1, 2, 3), -10.0)
+        logits[0, 0, 2] = 5.0  # confident car
+        logits[0, 1, 2] = 0.0  # 50% car
+        mock_model_instance.return_value = Mock(
+            logits=logits, pred_boxes=torch.tensor([[[0.5, 0.5, 0.25, 0.25], [0.1, 0.1, 0.1, 0.1]]])
+        )
+        
+        has_cars, detections = detector.detect_cars(sample_image)
+        
+        assert has_cars is True
+        assert len(detections) == 1
+        assert detections[0]["confidence"] == pytest.approx(torch.tensor(5.0).sigmoid().item())
+        assert detections[0]["bbox"] == pytest.approx([240, 180, 400, 300])
+        # Fixed 640x640 input, no aspect-preserving resize
+        pixel_values = mock_model_instance.call_args.kwargs["pixel_values"]
+        assert pixel_values.shape == (1, 3, 640, 640)
+    
+    def test_yolo_backend(self, sample_image):
+        """Test that the yolov8n backend maps ultralytics boxes to the detection format"""
+        with patch('src.car_detector.YOLO') as mock_yolo:
+            mock_model_instance = Mock()
+            mock_model_instance.names = {0: 'person', 1: 'bicycle', 2: 'car'}
+            mock_model_instance.return_value = []  # warmup results
+            mock_yolo.return_value = mock_model_instance
+            
+            # compile only applies to DETR backends, YOLO must still be warmed up
+            detector = CarDetector(model_backend="yolov8n", compile_model=True)
+        
+        mock_yolo.assert_called_once_with("yolov8n.pt")
+        assert mock_model_instance.call_count == 3
+        result = Mock()
+        result.boxes.conf = torch.tensor([0.95])
+        result.boxes.xyxy = torch.tensor([[100., 100., 200., 200.]])
+        mock_model_instance.return_value = [result]
+        
+        has_cars, detections = detector.detect_cars(sample_image)
+        
+        assert has_cars is True
+        assert detections[0]["confidence"] == pytest.approx(0.95)
+        assert detections[0]["bbox"] == [100, 100, 200, 200]
+        images = mock_model_instance.call_args.args[0]
+        assert images[0].shape == (480, 640, 3)
+        assert mock_model_instance.call_args.kwargs["classes"] == [2]
+        assert detector.get_model_info()["available_labels"] == ['person', 'bicycle', 'car']